@@ -2,19 +2,103 @@ import asyncio
 import logging
 import os
 import sys
-from typing import List, Optional, Dict, Any
-import requests
+import time
+from typing import List, Optional, Dict, Any, Tuple
+import httpx
+import orjson
 from mcp.server import Server
 from mcp.types import Tool, TextContent, Prompt, PromptMessage, GetPromptResult
 from mcp.server.stdio import stdio_server
 from mcp.server.models import InitializationOptions
 
-# 设置日志级别为 DEBUG，显示更多信息
+try:
+    import uvloop
+except ImportError:  # uvloop 不支持 Windows，此时使用默认事件循环
+    uvloop = None
+
+# 日志级别默认为 INFO，可通过 DINGDING_LOG_LEVEL 环境变量调整（如 DEBUG）
+_log_level_name = os.environ.get("DINGDING_LOG_LEVEL", "INFO").upper()
+_log_level = logging.getLevelName(_log_level_name)
 logging.basicConfig(
-    level=logging.DEBUG,  # 改为 DEBUG 级别
+    level=_log_level if isinstance(_log_level, int) else logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+# httpx/httpcore 会在 INFO/DEBUG 级别记录完整 URL，其中含 appsecret 和 access_token
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
 logger = logging.getLogger("dingding_mcp_server")
+if not isinstance(_log_level, int):
+    logger.warning(f"Invalid DINGDING_LOG_LEVEL {_log_level_name!r}, falling back to INFO")
+
+# MCP 工具定义，模块加载时构建一次，所有 list_tools 调用共用
+_TOOLS = (
+    Tool(
+        name="get_access_token",
+        description="Retrieves an access token from the DingTalk API for authentication purposes.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
+    Tool(
+        name="get_department_list",
+        description="Retrieves a list of all departments in the organization.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "fetch_child": {
+                    "type": "boolean",
+                    "description": "Whether to include child departments in the response. Default is true.",
+                    "default": True
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="get_department_users",
+        description="Retrieves a list of users in a specific department.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "department_id": {
+                    "type": "integer",
+                    "description": "The ID of the department to query."
+                }
+            },
+            "required": ["department_id"]
+        }
+    ),
+    Tool(
+        name="search_user_by_name",
+        description="Searches for a user across all departments by their name.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "The exact name of the user to search for."
+                }
+            },
+            "required": ["name"]
+        }
+    ),
+)
+
+# get_prompt 返回的固定内容，同样只构建一次
+_PROMPT_RESULT = GetPromptResult(
+    description="DingTalk MCP Prompt",
+    messages=[
+        PromptMessage(
+            role="user",
+            content=TextContent(
+                type="text",
+                text="This is a DingTalk MCP service."
+            )
+        )
+    ]
+)
 
 class DingTalkAPIError(Exception):
     """钉钉 API 错误"""
@@ -24,25 +108,82 @@ class DingTalkAPIError(Exception):
         super().__init__(f"{message}: {error_msg} (code: {error_code})")
 
 class DingdingMCPServer:
+    # 钉钉接口路径（相对于 base_url）
+    URL_TOKEN = "/gettoken"
+    URL_DEPT_LIST = "/v1/department/list"
+    URL_USER_SIMPLELIST = "/v1/user/simplelist"
+    URL_USER_GET = "/v1/user/get"
+    # search_user_by_name 并发请求部门用户列表的上限
+    SEARCH_CONCURRENCY = 10
+    # 对瞬时错误的重试次数、退避基数（秒）及需要重试的 HTTP 状态码
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.2
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # Retry-After 允许等待的最长时间（秒），超过则不再重试，直接返回错误
+    MAX_RETRY_DELAY = 10.0
+    # 表示 access_token 无效或已过期的钉钉错误码，遇到时刷新 token 并重试一次
+    TOKEN_EXPIRED_CODES = (88, 40014, 42001)
+    # 用户详情缓存的有效期（秒）及最大条目数
+    USER_CACHE_TTL = 300
+    USER_CACHE_SIZE = 1024
+    # 姓名索引的有效期（秒）；因瞬时错误缺失部分部门时使用较短的有效期
+    NAME_INDEX_TTL = 300
+    NAME_INDEX_PARTIAL_TTL = 30
+    # 表示用户不存在（已离职或 userid 无效）的钉钉错误码，遇到时作废姓名索引
+    USER_NOT_FOUND_CODES = (33012, 60121)
+
     def __init__(self):
         logger.debug("Initializing DingdingMCPServer...")
         self.base_url = "https://oapi.dingtalk.com"
-        self.access_token = None
-        self._session = requests.Session()
+        self._token: Optional[str] = None
+        self._token_expiry = 0.0
+        self._token_lock = asyncio.Lock()
+        # userid -> (过期时间, 用户详情)
+        self._user_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # 姓名 -> [(userid, 部门名称)]，供 search_user_by_name 复用
+        self._name_index: Optional[Dict[str, List[Tuple[str, str]]]] = None
+        self._name_index_expiry = 0.0
+        self._name_index_lock = asyncio.Lock()
+        # 复用到 oapi.dingtalk.com 的连接，连接失败时由 transport 自动重试；
+        # 启用 HTTP/2 后并发请求可在同一条 TLS 连接上多路复用
+        limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=10.0,
+            limits=limits,
+            # 部门/用户列表 JSON 压缩率高，显式要求压缩传输（httpx 自动解压）
+            headers={"Accept-Encoding": "gzip, deflate"},
+            transport=httpx.AsyncHTTPTransport(http2=True, retries=self.MAX_RETRIES, limits=limits)
+        )
         self.app = Server("dingding-mcp")
         logger.debug("Created MCP Server instance with name: dingding-mcp")
         self.setup_tools()
         self.setup_prompts()
         logger.debug("Server initialization completed")
 
-    def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def _make_request(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """发送 HTTP 请求并处理通用错误"""
-        logger.debug(f"Making request to URL: {url} with params: {params}")
+        # 请求参数和响应体可能很大，使用惰性格式化，未开启 DEBUG 时不做字符串化
+        logger.debug("Making request to URL: %s with params: %s", path, params)
         try:
-            response = self._session.get(url, params=params, timeout=10)
+            for attempt in range(self.MAX_RETRIES + 1):
+                response = await self._client.get(path, params=params)
+                if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                    break
+                delay = self.RETRY_BACKOFF * (2 ** attempt)
+                # 服务端通过 Retry-After 指定了等待时间时以其为准，等待过久则直接失败
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    if float(retry_after) > self.MAX_RETRY_DELAY:
+                        logger.warning(f"Got HTTP {response.status_code} from {path} with Retry-After "
+                                       f"{retry_after}s, exceeding {self.MAX_RETRY_DELAY:.0f}s; not retrying")
+                        break
+                    delay = max(delay, float(retry_after))
+                logger.warning(f"Got HTTP {response.status_code} from {path}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
             response.raise_for_status()
-            data = response.json()
-            logger.debug(f"Response received: {data}")
+            data = orjson.loads(response.content)
+            logger.debug("Response received: %s", data)
             
             if data.get("errcode", 0) != 0:
                 logger.error(f"DingTalk API error: {data}")
@@ -53,161 +194,231 @@ class DingdingMCPServer:
                 )
             
             return data
-        except requests.RequestException as e:
-            logger.error(f"HTTP request failed: {str(e)}", exc_info=True)
-            raise DingTalkAPIError("HTTP request failed", -1, str(e))
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP request failed: {str(e)}")
+            raise DingTalkAPIError("HTTP request failed", -1, str(e)) from e
         except ValueError as e:
-            logger.error(f"Invalid JSON response: {str(e)}", exc_info=True)
-            raise DingTalkAPIError("Invalid JSON response", -1, str(e))
+            logger.error(f"Invalid JSON response: {str(e)}")
+            raise DingTalkAPIError("Invalid JSON response", -1, str(e)) from e
+
+    async def get_access_token(self) -> str:
+        """获取钉钉access token（带缓存，过期前 60 秒刷新）"""
+        if self._token and time.monotonic() < self._token_expiry:
+            return self._token
+
+        async with self._token_lock:
+            # 等锁期间可能已被其他调用刷新
+            if self._token and time.monotonic() < self._token_expiry:
+                return self._token
+
+            logger.debug("Attempting to get access token...")
+            try:
+                appkey = os.environ.get("DINGDING_APP_KEY")
+                appsecret = os.environ.get("DINGDING_APP_SECRET")
+
+                if not all([appkey, appsecret]):
+                    logger.error("Missing DingTalk API credentials in environment variables")
+                    raise ValueError("Missing DingTalk API credentials in environment variables")
+
+                logger.debug(f"Using APP_KEY: {appkey[:4]}*** and APP_SECRET: {appsecret[:4]}***")
+
+                data = await self._make_request(self.URL_TOKEN, {
+                    "appkey": appkey,
+                    "appsecret": appsecret
+                })
 
-    def get_access_token(self) -> str:
-        """获取钉钉access token"""
-        logger.debug("Attempting to get access token...")
+                token = data["access_token"]
+                expires_in = data.get("expires_in", 7200)
+                self._token = token
+                self._token_expiry = time.monotonic() + expires_in - 60
+                logger.debug(f"Successfully obtained access token: {token[:4]}***, expires in {expires_in}s")
+                return token
+
+            except Exception as e:
+                logger.error(f"Failed to get access token: {str(e)}")
+                raise
+
+    async def _make_authed_request(self, path: str, params: Dict[str, Any],
+                                   access_token: Optional[str] = None) -> Dict[str, Any]:
+        """携带 access_token 发送请求，token 失效时刷新并重试一次"""
+        if access_token is None:
+            access_token = await self.get_access_token()
         try:
-            appkey = os.environ.get("DINGDING_APP_KEY")
-            appsecret = os.environ.get("DINGDING_APP_SECRET")
-            
-            logger.debug(f"Using APP_KEY: {appkey[:4]}*** and APP_SECRET: {appsecret[:4]}***")
-            
-            if not all([appkey, appsecret]):
-                logger.error("Missing DingTalk API credentials in environment variables")
-                raise ValueError("Missing DingTalk API credentials in environment variables")
-            
-            url = f"{self.base_url}/gettoken"
-            data = self._make_request(url, {
-                "appkey": appkey,
-                "appsecret": appsecret
-            })
-            
-            token = data["access_token"]
-            logger.debug(f"Successfully obtained access token: {token[:4]}***")
-            return token
-            
-        except Exception as e:
-            logger.error(f"Failed to get access token: {str(e)}", exc_info=True)
-            raise
+            return await self._make_request(path, {"access_token": access_token, **params})
+        except DingTalkAPIError as e:
+            if e.error_code not in self.TOKEN_EXPIRED_CODES:
+                raise
+            logger.warning(f"Access token rejected by {path} (code: {e.error_code}), refreshing")
+            # 只作废本次使用的 token，避免覆盖其他调用已刷新的新 token
+            if self._token == access_token:
+                self._token = None
+                self._token_expiry = 0.0
+            access_token = await self.get_access_token()
+            return await self._make_request(path, {"access_token": access_token, **params})
+
+    async def _get_department_list_raw(self, fetch_child: bool = True,
+                                       access_token: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取部门列表原始数据，未传入 access_token 时自动获取"""
+        data = await self._make_authed_request(self.URL_DEPT_LIST, {
+            "fetch_child": fetch_child
+        }, access_token)
+        return data.get("department", [])
 
-    def get_department_list(self, fetch_child: bool = True) -> str:
+    async def _get_department_users_raw(self, department_id: int,
+                                        access_token: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取部门用户列表原始数据，未传入 access_token 时自动获取"""
+        data = await self._make_authed_request(self.URL_USER_SIMPLELIST, {
+            "department_id": department_id
+        }, access_token)
+        return data.get("userlist", [])
+
+    async def get_department_list(self, fetch_child: bool = True) -> str:
         """获取部门列表"""
         try:
-            access_token = self.get_access_token()
-            url = f"{self.base_url}/v1/department/list"
-            data = self._make_request(url, {
-                "access_token": access_token,
-                "fetch_child": fetch_child
-            })
-            
-            departments = data.get("department", [])
-            result = []
-            for dept in departments:
-                result.append(
-                    f"Department ID: {dept['id']}\n"
-                    f"Name: {dept['name']}\n"
-                    f"Parent ID: {dept.get('parentid', 'N/A')}\n"
-                    f"---"
-                )
-            return "\n".join(result) if result else "No departments found"
+            departments = await self._get_department_list_raw(fetch_child)
+            return "\n".join(
+                f"Department ID: {dept['id']}\n"
+                f"Name: {dept['name']}\n"
+                f"Parent ID: {dept.get('parentid', 'N/A')}\n"
+                f"---"
+                for dept in departments
+            ) or "No departments found"
             
         except Exception as e:
             logger.error(f"Failed to get department list: {str(e)}")
             return f"Error: {str(e)}"
 
-    def get_department_users(self, department_id: int) -> str:
+    async def get_department_users(self, department_id: int) -> str:
         """获取部门用户列表"""
         try:
-            access_token = self.get_access_token()
-            url = f"{self.base_url}/v1/user/simplelist"
-            data = self._make_request(url, {
-                "access_token": access_token,
-                "department_id": department_id
-            })
-            
-            users = data.get("userlist", [])
-            result = []
-            for user in users:
-                result.append(
-                    f"User ID: {user['userid']}\n"
-                    f"Name: {user['name']}\n"
-                    f"---"
-                )
-            return "\n".join(result) if result else "No users found in this department"
+            users = await self._get_department_users_raw(department_id)
+            return "\n".join(
+                f"User ID: {user['userid']}\n"
+                f"Name: {user['name']}\n"
+                f"---"
+                for user in users
+            ) or "No users found in this department"
             
         except Exception as e:
             logger.error(f"Failed to get department users: {str(e)}")
             return f"Error: {str(e)}"
 
-    def get_user_detail(self, userid: str) -> Dict[str, Any]:
-        """获取用户详细信息"""
+    async def get_user_detail(self, userid: str, access_token: Optional[str] = None) -> Dict[str, Any]:
+        """获取用户详细信息（带 TTL 缓存），未传入 access_token 时自动获取"""
+        cached = self._user_cache.get(userid)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+
         try:
-            access_token = self.get_access_token()
-            url = f"{self.base_url}/v1/user/get"
-            return self._make_request(url, {
-                "access_token": access_token,
+            data = await self._make_authed_request(self.URL_USER_GET, {
                 "userid": userid
-            })
+            }, access_token)
         except Exception as e:
             logger.error(f"Failed to get user details: {str(e)}")
             raise
 
-    def search_user_by_name(self, name: str) -> str:
+        # 过期条目重新插入到末尾；缓存满时淘汰最早写入的条目
+        self._user_cache.pop(userid, None)
+        if len(self._user_cache) >= self.USER_CACHE_SIZE:
+            self._user_cache.pop(next(iter(self._user_cache)))
+        self._user_cache[userid] = (time.monotonic() + self.USER_CACHE_TTL, data)
+        return data
+
+    @staticmethod
+    def _is_transient_error(e: Exception) -> bool:
+        """HTTP 层失败（网络错误、超时、5xx、无效响应）视为瞬时错误，钉钉业务错误码不是"""
+        return not isinstance(e, DingTalkAPIError) or e.error_code == -1
+
+    async def _build_name_index(self, access_token: str) -> Tuple[Dict[str, List[Tuple[str, str]]], bool]:
+        """并发获取所有部门的用户列表，构建姓名索引，返回 (索引, 是否没有部门因瞬时错误缺失)"""
+        departments = await self._get_department_list_raw(access_token=access_token)
+
+        # 信号量限制同时在途的请求数
+        sem = asyncio.Semaphore(self.SEARCH_CONCURRENCY)
+        complete = True
+
+        async def fetch_users(dept_id: int) -> List[Dict[str, Any]]:
+            nonlocal complete
+            async with sem:
+                try:
+                    return await self._get_department_users_raw(dept_id, access_token)
+                except Exception as e:
+                    logger.warning(f"Failed to get users for department {dept_id}: {str(e)}")
+                    # 无权限等业务错误重试也不会成功，不影响索引缓存
+                    if self._is_transient_error(e):
+                        complete = False
+                    return []
+
+        users_lists = await asyncio.gather(*[fetch_users(dept['id']) for dept in departments])
+
+        # 按部门顺序登记，同名用户保留各自的部门
+        index: Dict[str, List[Tuple[str, str]]] = {}
+        for dept, users in zip(departments, users_lists):
+            for user in users:
+                index.setdefault(user['name'], []).append((user['userid'], dept['name']))
+        logger.debug(f"Built name index with {len(index)} names from {len(departments)} departments")
+        return index, complete
+
+    async def _get_name_index(self, access_token: str) -> Dict[str, List[Tuple[str, str]]]:
+        """获取姓名索引（过期后重建）"""
+        if self._name_index is not None and time.monotonic() < self._name_index_expiry:
+            return self._name_index
+
+        async with self._name_index_lock:
+            # 等锁期间可能已被其他调用重建
+            if self._name_index is not None and time.monotonic() < self._name_index_expiry:
+                return self._name_index
+
+            index, complete = await self._build_name_index(access_token)
+            self._name_index = index
+            # 有部门因瞬时错误缺失时索引不完整，只短时间缓存，之后重建
+            ttl = self.NAME_INDEX_TTL if complete else self.NAME_INDEX_PARTIAL_TTL
+            self._name_index_expiry = time.monotonic() + ttl
+            return index
+
+    def _invalidate_name_index(self):
+        """作废姓名索引，下次搜索时重建"""
+        self._name_index_expiry = 0.0
+
+    async def search_user_by_name(self, name: str) -> str:
         """根据姓名搜索用户信息"""
         try:
-            # 获取所有部门
-            dept_list_str = self.get_department_list()
-            if not dept_list_str or "Error" in dept_list_str:
-                return f"Failed to get department list: {dept_list_str}"
-            
-            # 解析部门列表字符串
-            departments = []
-            current_dept = {}
-            for line in dept_list_str.split('\n'):
-                if line.startswith('Department ID:'):
-                    if current_dept:
-                        departments.append(current_dept)
-                    current_dept = {'id': int(line.split(': ')[1])}
-                elif line.startswith('Name:'):
-                    current_dept['name'] = line.split(': ')[1]
-            if current_dept:
-                departments.append(current_dept)
-            
-            # 遍历所有部门查找用户
-            for dept in departments:
-                dept_id = dept['id']
-                users_str = self.get_department_users(dept_id)
-                
-                if "Error" in users_str or "Failed" in users_str:
-                    logger.warning(f"Failed to get users for department {dept_id}: {users_str}")
+            try:
+                # 整个搜索只获取一次 token，传给所有内部调用
+                access_token = await self.get_access_token()
+                index = await self._get_name_index(access_token)
+            except Exception as e:
+                logger.error(f"Failed to get department list: {str(e)}")
+                return f"Failed to get department list: Error: {str(e)}"
+
+            candidates = index.get(name, [])
+            # 同名用户的详情并发获取；同一用户可能属于多个部门，只请求一次
+            userids = list(dict.fromkeys(userid for userid, _ in candidates))
+            details = await asyncio.gather(
+                *[self.get_user_detail(userid, access_token) for userid in userids],
+                return_exceptions=True
+            )
+            details_by_id = dict(zip(userids, details))
+            for userid, user_detail in details_by_id.items():
+                if isinstance(user_detail, Exception):
+                    logger.error(f"Failed to get details for user {userid}: {str(user_detail)}")
+                    # 索引中的用户已不存在（如离职），作废索引以便下次重新获取
+                    if (isinstance(user_detail, DingTalkAPIError)
+                            and user_detail.error_code in self.USER_NOT_FOUND_CODES):
+                        self._invalidate_name_index()
+
+            # 按部门顺序返回第一个成功获取详情的用户
+            for userid, dept_name in candidates:
+                user_detail = details_by_id[userid]
+                if isinstance(user_detail, Exception):
                     continue
-                
-                # 解析用户列表字符串
-                users = []
-                current_user = {}
-                for line in users_str.split('\n'):
-                    if line.startswith('User ID:'):
-                        if current_user:
-                            users.append(current_user)
-                        current_user = {'userid': line.split(': ')[1]}
-                    elif line.startswith('Name:'):
-                        current_user['name'] = line.split(': ')[1]
-                if current_user:
-                    users.append(current_user)
-                
-                # 在部门中查找匹配姓名的用户
-                for user in users:
-                    if user['name'] == name:
-                        try:
-                            # 获取用户详细信息
-                            user_detail = self.get_user_detail(user['userid'])
-                            return (f"Found user:\n"
-                                   f"User ID: {user_detail['userid']}\n"
-                                   f"Name: {user_detail['name']}\n"
-                                   f"Mobile: {user_detail.get('mobile', 'N/A')}\n"
-                                   f"Email: {user_detail.get('email', 'N/A')}\n"
-                                   f"Position: {user_detail.get('position', 'N/A')}\n"
-                                   f"Department: {dept['name']}")
-                        except Exception as e:
-                            logger.error(f"Failed to get details for user {user['userid']}: {str(e)}")
-                            continue
+                return (f"Found user:\n"
+                       f"User ID: {user_detail['userid']}\n"
+                       f"Name: {user_detail['name']}\n"
+                       f"Mobile: {user_detail.get('mobile', 'N/A')}\n"
+                       f"Email: {user_detail.get('email', 'N/A')}\n"
+                       f"Position: {user_detail.get('position', 'N/A')}\n"
+                       f"Department: {dept_name}")
             
             return f"No user found with name: {name}"
             
@@ -218,96 +429,41 @@ class DingdingMCPServer:
     def setup_tools(self):
         logger.debug("Setting up MCP tools...")
         
-        tools = [
-            Tool(
-                name="get_access_token",
-                description="Retrieves an access token from the DingTalk API for authentication purposes.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            ),
-            Tool(
-                name="get_department_list",
-                description="Retrieves a list of all departments in the organization.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "fetch_child": {
-                            "type": "boolean",
-                            "description": "Whether to include child departments in the response. Default is true.",
-                            "default": True
-                        }
-                    },
-                    "required": []
-                }
-            ),
-            Tool(
-                name="get_department_users",
-                description="Retrieves a list of users in a specific department.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "department_id": {
-                            "type": "integer",
-                            "description": "The ID of the department to query."
-                        }
-                    },
-                    "required": ["department_id"]
-                }
-            ),
-            Tool(
-                name="search_user_by_name",
-                description="Searches for a user across all departments by their name.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "The exact name of the user to search for."
-                        }
-                    },
-                    "required": ["name"]
-                }
-            )
-        ]
-        
         async def list_tools() -> List[Tool]:
             logger.debug("list_tools called")
-            return tools
+            return list(_TOOLS)
         
         async def call_tool(name: str, arguments: dict) -> List[TextContent]:
-            logger.debug(f"Tool called: {name} with arguments: {arguments}")
+            logger.debug("Tool called: %s with arguments: %s", name, arguments)
             try:
                 result = None
                 if name == "get_access_token":
-                    token = self.get_access_token()
+                    token = await self.get_access_token()
                     result = [TextContent(type="text", text=f"Access Token: {token}")]
                 
                 elif name == "get_department_list":
                     fetch_child = arguments.get("fetch_child", True)
-                    logger.debug(f"Fetching department list with fetch_child={fetch_child}")
-                    result = self.get_department_list(fetch_child)
+                    logger.debug("Fetching department list with fetch_child=%s", fetch_child)
+                    result = await self.get_department_list(fetch_child)
                     result = [TextContent(type="text", text=result)]
                 
                 elif name == "get_department_users":
                     department_id = arguments["department_id"]
-                    logger.debug(f"Fetching users for department ID: {department_id}")
-                    result = self.get_department_users(department_id)
+                    logger.debug("Fetching users for department ID: %s", department_id)
+                    result = await self.get_department_users(department_id)
                     result = [TextContent(type="text", text=result)]
                 
                 elif name == "search_user_by_name":
                     name = arguments["name"]
-                    logger.debug(f"Searching for user with name: {name}")
-                    result = self.search_user_by_name(name)
+                    logger.debug("Searching for user with name: %s", name)
+                    result = await self.search_user_by_name(name)
                     result = [TextContent(type="text", text=result)]
                 
                 else:
                     logger.warning(f"Unknown tool called: {name}")
                     result = [TextContent(type="text", text=f"Unknown tool: {name}")]
                 
-                logger.debug(f"Tool {name} completed with result: {result}")
+                logger.debug("Tool %s completed with result: %s", name, result)
                 return result
                     
             except Exception as e:
@@ -326,19 +482,8 @@ class DingdingMCPServer:
             return []
         
         async def get_prompt(name: str, arguments: Optional[Dict[str, str]] = None) -> GetPromptResult:
-            logger.debug(f"get_prompt called with name: {name}, arguments: {arguments}")
-            return GetPromptResult(
-                description="DingTalk MCP Prompt",
-                messages=[
-                    PromptMessage(
-                        role="system",
-                        content=TextContent(
-                            type="text",
-                            text="This is a DingTalk MCP service."
-                        )
-                    )
-                ]
-            )
+            logger.debug("get_prompt called with name: %s, arguments: %s", name, arguments)
+            return _PROMPT_RESULT
         
         self.app.list_prompts_handler = list_prompts
         self.app.get_prompt_handler = get_prompt
@@ -363,6 +508,7 @@ class DingdingMCPServer:
                 logger.error(f"Server error: {str(e)}", exc_info=True)
                 raise
             finally:
+                await self._client.aclose()
                 logger.debug("Server run completed")
 
 def main():
@@ -370,7 +516,11 @@ def main():
     try:
         server = DingdingMCPServer()
         logger.debug("Server instance created")
-        asyncio.run(server.run())
+        if uvloop is not None:
+            logger.debug("Running server on uvloop event loop")
+            uvloop.run(server.run())
+        else:
+            asyncio.run(server.run())
     except Exception as e:
         logger.error(f"Main function error: {str(e)}", exc_info=True)
         sys.exit(1)